@@ -0,0 +1,107 @@
+# Customer Service Conversation Analyzer - Shared Models
+# Copyright (C) 2024 Arnav BallinCode
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import functools
+import threading
+from faster_whisper import WhisperModel
+from transformers import pipeline
+import torch
+import torch._dynamo
+import torch._inductor.config
+
+# Reuse compiled graphs across process restarts and raise the recompile limit.
+# Inputs to the compiled model are padded to one length, so one graph is expected
+if hasattr(torch._inductor.config, "fx_graph_cache"):
+    torch._inductor.config.fx_graph_cache = True
+torch._dynamo.config.cache_size_limit = 32
+
+# Token length single-message inputs are padded to on GPU, so reduce-overhead
+# can capture one static shape and replay it as a CUDA graph
+SENTIMENT_MAX_LENGTH = 128
+
+class WhisperManager:
+    """Process-wide Whisper model cache, one model per device and size"""
+    _models = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_model(cls, device=None, size="tiny"):
+        # CTranslate2 backend: float16 on GPU, int8 on CPU
+        device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        with cls._lock:
+            if (device, size) not in cls._models:
+                cls._models[(device, size)] = WhisperModel(
+                    size,
+                    device=device,
+                    compute_type="float16" if device == "cuda" else "int8"
+                )
+            return cls._models[(device, size)]
+
+@functools.lru_cache(maxsize=1)
+def get_batch_sentiment_pipeline():
+    """Load the sentiment weights once, as an eager, unpadded pipeline
+
+    Suited to variable-size batches; get_sentiment_pipeline shares its weights.
+    """
+    sentiment_analyzer = pipeline(
+        "sentiment-analysis",
+        model="finiteautomata/bertweet-base-sentiment-analysis",
+        device=0 if torch.cuda.is_available() else -1,
+        truncation=True
+    )
+
+    # Quantize Linear layers to int8 when running on CPU. The quantized model
+    # stays eager: dynamo cannot trace the dynamic int8 Linear kernels and
+    # would graph-break at every layer
+    if sentiment_analyzer.device.type == "cpu":
+        sentiment_analyzer.model = torch.quantization.quantize_dynamic(
+            sentiment_analyzer.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    return sentiment_analyzer
+
+@functools.lru_cache(maxsize=1)
+def get_sentiment_pipeline():
+    """Pipeline for one message per call, compiled on GPU over the shared weights"""
+    eager_analyzer = get_batch_sentiment_pipeline()
+
+    # reduce-overhead only pays off through CUDA graphs
+    if eager_analyzer.device.type != "cuda":
+        return eager_analyzer
+
+    # Pad every single-message input to one fixed length so the compiled model
+    # sees a single static shape, then absorb the first-compile cost here
+    # rather than on the first real message. Fall back to the eager pipeline
+    # if the compiler is unavailable
+    sentiment_analyzer = pipeline(
+        "sentiment-analysis",
+        model=eager_analyzer.model,
+        tokenizer=eager_analyzer.tokenizer,
+        device=eager_analyzer.device,
+        padding="max_length",
+        max_length=SENTIMENT_MAX_LENGTH,
+        truncation=True
+    )
+    try:
+        sentiment_analyzer.model = torch.compile(
+            sentiment_analyzer.model, mode="reduce-overhead", fullgraph=False
+        )
+        sentiment_analyzer("warmup")
+    except Exception as e:
+        print(f"torch.compile failed, using eager sentiment model: {str(e)}")
+        return eager_analyzer
+
+    return sentiment_analyzer
@@ -16,15 +16,15 @@
 
 import pyaudio
 import wave
-import whisper
+from faster_whisper.vad import VadOptions, collect_chunks, get_speech_timestamps
 import numpy as np
 import threading
 import queue
 import time
-from transformers import pipeline
 import torch
 import os
 from sop_analyzer import SOPAnalyzer
+from _models import WhisperManager, get_batch_sentiment_pipeline, get_sentiment_pipeline
 import argparse
 
 class LiveConversationAnalyzer:
@@ -38,14 +38,15 @@ class LiveConversationAnalyzer:
         
         # Initialize Whisper
         print("Loading Whisper model...")
-        self.whisper_model = whisper.load_model("base")
+        self.whisper_model = WhisperManager.get_model(size="base")
         
         # Initialize sentiment analyzer
         print("Loading sentiment analyzer...")
-        self.sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model="finiteautomata/bertweet-base-sentiment-analysis"
-        )
+        # Live windows arrive one segment at a time and use the single-message
+        # pipeline (compiled on GPU); files arrive in batches of varying size
+        # and use the eager, unpadded pipeline over the same weights
+        self.sentiment_analyzer = get_sentiment_pipeline()
+        self.batch_sentiment_analyzer = get_batch_sentiment_pipeline()
         
         # Initialize SOP analyzer
         print("Loading SOP analyzer...")
@@ -55,10 +56,25 @@ class LiveConversationAnalyzer:
         self.audio = pyaudio.PyAudio()
         self.frames_queue = queue.Queue()
         self.is_recording = False
+        self.stream = None
+        self.analysis_thread = None
+        
+        # Preallocated buffer holding one analysis window of float32 samples
+        self._audio_buf = np.empty(self.RATE * self.RECORD_SECONDS, dtype=np.float32)
+        self._audio_idx = 0
+        
+        # Voice activity detection used to skip silent windows
+        self.vad_options = VadOptions(min_silence_duration_ms=500)
         
         # Analysis results
         self.current_speaker = "Speaker 1"
-        self.conversation_history = []
+        
+        # Conversation history, stored as parallel per-field lists
+        self._speakers = []
+        self._texts = []
+        self._sentiments = []
+        self._confidences = []
+        self._timestamps = []
     
     def analyze_audio_file(self, audio_path):
         """Analyze an existing audio file"""
@@ -69,34 +85,13 @@ class LiveConversationAnalyzer:
         print(f"\nProcessing audio file: {audio_path}")
         try:
             # Transcribe the entire audio file
-            result = self.whisper_model.transcribe(audio_path)
+            segments, info = self.whisper_model.transcribe(audio_path, beam_size=1, vad_filter=True)
+            
+            # Collect non-empty segment texts
+            texts = [segment.text.strip() for segment in segments]
+            texts = [text for text in texts if text]
             
-            # Process each segment
-            for segment in result["segments"]:
-                text = segment["text"].strip()
-                if text:
-                    # Detect speaker changes
-                    if self._should_switch_speaker(text):
-                        self.current_speaker = "Speaker 2" if self.current_speaker == "Speaker 1" else "Speaker 1"
-                    
-                    # Analyze sentiment
-                    sentiment = self.sentiment_analyzer(text)[0]
-                    
-                    # Analyze against SOP
-                    self.sop_analyzer.analyze_message(text, self.current_speaker)
-                    
-                    # Store results
-                    analysis = {
-                        "speaker": self.current_speaker,
-                        "text": text,
-                        "sentiment": sentiment["label"],
-                        "confidence": sentiment["score"],
-                        "timestamp": time.strftime("%H:%M:%S")
-                    }
-                    self.conversation_history.append(analysis)
-                    
-                    # Print analysis
-                    self._print_live_analysis(analysis)
+            self._analyze_segments(texts)
             
             # Print final analysis
             self._print_final_analysis()
@@ -110,98 +105,146 @@ class LiveConversationAnalyzer:
     
     def start_recording(self):
         """Start recording audio"""
+        self._audio_idx = 0
+        
+        # PortAudio delivers buffers to _pa_cb on its own thread. Open the stream
+        # before starting the analysis thread so a failure here leaves nothing running
+        self.stream = self.audio.open(
+            format=self.FORMAT,
+            channels=self.CHANNELS,
+            rate=self.RATE,
+            input=True,
+            frames_per_buffer=self.CHUNK,
+            stream_callback=self._pa_cb
+        )
+        
         self.is_recording = True
-        self.recording_thread = threading.Thread(target=self._record_audio)
         self.analysis_thread = threading.Thread(target=self._process_audio)
         
         print("\nStarting live conversation analysis...")
         print("Press Ctrl+C to stop recording\n")
         
-        self.recording_thread.start()
         self.analysis_thread.start()
     
     def stop_recording(self):
         """Stop recording audio"""
+        # Recording may be interrupted before the stream was opened
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        
+        # Flush any partial window left when recording stops
+        if self._audio_idx:
+            self.frames_queue.put(self._audio_buf[:self._audio_idx].copy())
+            self._audio_idx = 0
+        
         self.is_recording = False
-        self.recording_thread.join()
-        self.analysis_thread.join()
+        if self.analysis_thread is not None:
+            self.analysis_thread.join()
+            self.analysis_thread = None
         self.audio.terminate()
         
         # Print final analysis
         self._print_final_analysis()
     
-    def _record_audio(self):
-        """Record audio in chunks"""
-        stream = self.audio.open(
-            format=self.FORMAT,
-            channels=self.CHANNELS,
-            rate=self.RATE,
-            input=True,
-            frames_per_buffer=self.CHUNK
-        )
+    def _pa_cb(self, in_data, frame_count, time_info, status):
+        """PyAudio stream callback that fills the window buffer"""
+        samples = np.frombuffer(in_data, dtype=np.float32)
         
-        while self.is_recording:
-            frames = []
-            for _ in range(int(self.RATE / self.CHUNK * self.RECORD_SECONDS)):
-                if not self.is_recording:
-                    break
-                data = stream.read(self.CHUNK)
-                frames.append(data)
+        while len(samples):
+            # Copy as much of the chunk as fits into the window buffer
+            n = min(len(samples), len(self._audio_buf) - self._audio_idx)
+            self._audio_buf[self._audio_idx:self._audio_idx + n] = samples[:n]
+            self._audio_idx += n
+            samples = samples[n:]
             
-            if frames:
-                self.frames_queue.put(frames)
+            # Hand a full window to the analysis thread
+            if self._audio_idx == len(self._audio_buf):
+                self.frames_queue.put(self._audio_buf.copy())
+                self._audio_idx = 0
         
-        stream.stop_stream()
-        stream.close()
+        return (None, pyaudio.paContinue)
     
     def _process_audio(self):
         """Process audio chunks and perform analysis"""
         while self.is_recording or not self.frames_queue.empty():
-            if not self.frames_queue.empty():
-                frames = self.frames_queue.get()
-                
-                # Convert frames to numpy array
-                audio_data = np.frombuffer(b''.join(frames), dtype=np.float32)
-                
-                # Transcribe audio
-                result = self.whisper_model.transcribe(audio_data)
-                
-                if result["text"].strip():
-                    # Detect speaker changes
-                    text = result["text"].strip()
-                    if self._should_switch_speaker(text):
-                        self.current_speaker = "Speaker 2" if self.current_speaker == "Speaker 1" else "Speaker 1"
-                    
-                    # Analyze sentiment
-                    sentiment = self.sentiment_analyzer(text)[0]
-                    
-                    # Analyze against SOP
-                    self.sop_analyzer.analyze_message(text, self.current_speaker)
-                    
-                    # Store results
-                    analysis = {
-                        "speaker": self.current_speaker,
-                        "text": text,
-                        "sentiment": sentiment["label"],
-                        "confidence": sentiment["score"],
-                        "timestamp": time.strftime("%H:%M:%S")
-                    }
-                    self.conversation_history.append(analysis)
-                    
-                    # Print live analysis
-                    self._print_live_analysis(analysis)
+            # Block until the next window arrives instead of polling
+            try:
+                audio_data = self.frames_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            # Skip windows without any detected speech
+            speech_timestamps = get_speech_timestamps(audio_data, self.vad_options)
+            if not speech_timestamps:
+                continue
+            
+            # Transcribe only the detected speech, with greedy decoding and no
+            # cross-window context (VAD already ran, so Whisper skips its own)
+            segments, info = self.whisper_model.transcribe(
+                collect_chunks(audio_data, speech_timestamps),
+                beam_size=1,
+                best_of=1,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                vad_filter=False
+            )
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+            
+            if text:
+                self._analyze_segments([text])
+    
+    def _analyze_segments(self, texts):
+        """Run sentiment and SOP analysis over transcribed segments"""
+        if not texts:
+            return
+        
+        # Analyze sentiment, one static-shape call for a single segment or
+        # batched forward passes for many
+        if len(texts) == 1:
+            sentiments = self.sentiment_analyzer(texts, truncation=True)
+        else:
+            sentiments = self.batch_sentiment_analyzer(texts, batch_size=16, truncation=True)
+        
+        for text, sentiment in zip(texts, sentiments):
+            # Lowercase once for both speaker detection and SOP analysis
+            text_lower = text.lower()
             
-            time.sleep(0.1)
+            # Detect speaker changes
+            if self._should_switch_speaker(text, text_lower):
+                self.current_speaker = "Speaker 2" if self.current_speaker == "Speaker 1" else "Speaker 1"
+            
+            # Analyze against SOP
+            self.sop_analyzer.analyze_message(text, self.current_speaker, text_lower=text_lower)
+            
+            # Store results
+            analysis = {
+                "speaker": self.current_speaker,
+                "text": text,
+                "sentiment": sentiment["label"],
+                "confidence": sentiment["score"],
+                "timestamp": time.strftime("%H:%M:%S")
+            }
+            self._speakers.append(analysis["speaker"])
+            self._texts.append(analysis["text"])
+            self._sentiments.append(analysis["sentiment"])
+            self._confidences.append(analysis["confidence"])
+            self._timestamps.append(analysis["timestamp"])
+            
+            # Print live analysis
+            self._print_live_analysis(analysis)
     
-    def _should_switch_speaker(self, text):
+    def _should_switch_speaker(self, text, text_lower=None):
         """Determine if we should switch speakers based on content"""
-        if not self.conversation_history:
+        if not self._texts:
             return False
         
         # Check for patterns that might indicate a speaker change
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         greeting_words = ["hello", "hi", "good morning", "good afternoon"]
-        question_response = self.conversation_history[-1]["text"].strip().endswith("?")
+        question_response = self._texts[-1].strip().endswith("?")
         contains_greeting = any(word in text_lower for word in greeting_words)
         
         return question_response or contains_greeting
@@ -224,27 +267,28 @@ class LiveConversationAnalyzer:
         """Print final conversation analysis"""
         print("\n=== Final Conversation Analysis ===")
         
+        speakers = np.array(self._speakers, dtype=str)
+        sentiments = np.array(self._sentiments, dtype=str)
+        
         # Analyze per speaker
         for speaker in ["Speaker 1", "Speaker 2"]:
-            speaker_messages = [msg for msg in self.conversation_history if msg["speaker"] == speaker]
-            if speaker_messages:
+            indices = np.flatnonzero(speakers == speaker)
+            if len(indices):
                 print(f"\n{speaker}:")
-                print(f"Total messages: {len(speaker_messages)}")
+                print(f"Total messages: {len(indices)}")
                 
-                # Calculate average sentiment
-                sentiments = [msg["sentiment"] for msg in speaker_messages]
-                pos_count = sentiments.count("POS")
-                neu_count = sentiments.count("NEU")
-                neg_count = sentiments.count("NEG")
+                # Calculate sentiment distribution
+                labels, counts = np.unique(sentiments[indices], return_counts=True)
+                distribution = dict(zip(labels, counts / len(indices)))
                 
                 print("Sentiment distribution:")
-                print(f"- Positive: {pos_count/len(sentiments):.1%}")
-                print(f"- Neutral: {neu_count/len(sentiments):.1%}")
-                print(f"- Negative: {neg_count/len(sentiments):.1%}")
+                print(f"- Positive: {distribution.get('POS', 0):.1%}")
+                print(f"- Neutral: {distribution.get('NEU', 0):.1%}")
+                print(f"- Negative: {distribution.get('NEG', 0):.1%}")
                 
                 print("\nConversation flow:")
-                for msg in speaker_messages:
-                    print(f"[{msg['timestamp']}] {msg['text']}")
+                for i in indices:
+                    print(f"[{self._timestamps[i]}] {self._texts[i]}")
         
         # Print SOP compliance analysis
         print("\n" + self.sop_analyzer.get_analysis_report())
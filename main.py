@@ -1,12 +1,15 @@
-import os
-import whisper
-import torch
+import io
+import asyncio
 from fastapi import FastAPI, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
-import tempfile
-from typing import Dict, Any
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from typing import Dict, Any, BinaryIO
+from concurrent.futures import ThreadPoolExecutor
 from accelerate import init_empty_weights, load_checkpoint_and_dispatch
+from _models import WhisperManager, get_sentiment_pipeline
+
+# Single worker that runs all model calls off the event loop, serializing GPU work
+inference_executor = ThreadPoolExecutor(max_workers=1)
 
 app = FastAPI()
 
@@ -20,14 +23,26 @@ app.add_middleware(
 )
 
 # Initialize Whisper model (using the 'tiny' model for better performance on 16GB RAM)
-whisper_model = whisper.load_model("tiny")
+whisper_model = WhisperManager.get_model()
 
 # Initialize lightweight sentiment analysis model
-sentiment_analyzer = pipeline(
-    "sentiment-analysis",
-    model="finiteautomata/bertweet-base-sentiment-analysis",  # More lightweight model
-    device=0 if torch.cuda.is_available() else -1
-)
+sentiment_analyzer = get_sentiment_pipeline()
+
+def _transcribe(audio: BinaryIO):
+    """
+    Run Whisper on an in-memory audio file, returning the joined text and language
+    """
+    # Segments are decoded lazily, so consume them here on the worker thread
+    segments, info = whisper_model.transcribe(audio, beam_size=1, vad_filter=True)
+    text = " ".join(segment.text.strip() for segment in segments)
+    return text, info.language
+
+def _classify(text: str) -> Dict[str, Any]:
+    """
+    Run the sentiment model on a single text
+    """
+    # Precision is fixed when the model is loaded, matching the compiled warm-up
+    return sentiment_analyzer(text)[0]
 
 @app.post("/transcribe")
 async def transcribe_audio(file: UploadFile = File(...)) -> Dict[str, Any]:
@@ -35,22 +50,17 @@ async def transcribe_audio(file: UploadFile = File(...)) -> Dict[str, Any]:
     Transcribe audio file to text using Whisper
     """
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Keep the upload in memory; faster-whisper decodes file-like objects directly
+        content = await file.read()
+        audio = io.BytesIO(content)
 
-        # Transcribe audio with memory optimization
-        with torch.cuda.amp.autocast():  # Use mixed precision for better memory usage
-            result = whisper_model.transcribe(temp_file_path)
-        
-        # Clean up temporary file
-        os.unlink(temp_file_path)
+        # Transcribe audio on the inference worker (precision is set by the model's compute_type)
+        loop = asyncio.get_running_loop()
+        text, language = await loop.run_in_executor(inference_executor, _transcribe, audio)
         
         return {
-            "text": result["text"],
-            "language": result["language"]
+            "text": text,
+            "language": language
         }
     except Exception as e:
         return {"error": str(e)}
@@ -61,9 +71,9 @@ async def analyze_sentiment(text: str) -> Dict[str, Any]:
     Analyze sentiment of text using lightweight BERT model
     """
     try:
-        # Get sentiment analysis with memory optimization
-        with torch.cuda.amp.autocast():
-            result = sentiment_analyzer(text)[0]
+        # Get sentiment analysis on the inference worker
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(inference_executor, _classify, text)
         
         # Map sentiment to a 1-5 scale
         sentiment_map = {
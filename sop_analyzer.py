@@ -28,6 +28,20 @@ class SOPAnalyzer:
             "prohibited_phrases": {"score": 0, "total": 0, "details": []},
             "information_collection": {"score": 0, "total": 0, "details": []}
         }
+        
+        # Precompile each phrase set into a single case-insensitive alternation
+        phrase_sets = {
+            "greeting": ["hello", "hi", "good morning", "good afternoon"],
+            "problem": ["what seems to be", "what's the issue", "how can i help"],
+            "solution": ["next step", "please provide", "upload", "send"],
+            "closing": ["thank you", "anything else", "is there anything else"],
+            "info": ["order number", "product details", "contact information"],
+            "prohibited": self.sop_rules.get("prohibited_phrases", [])
+        }
+        self._patterns = {
+            category: re.compile("|".join(map(re.escape, phrases)), re.IGNORECASE) if phrases else None
+            for category, phrases in phrase_sets.items()
+        }
     
     def _load_sop(self, sop_file):
         """Load and parse the SOP file"""
@@ -47,59 +61,64 @@ class SOPAnalyzer:
         
         return rules
     
-    def analyze_message(self, message, speaker):
-        """Analyze a single message against SOP rules"""
+    def analyze_message(self, message, speaker, text_lower=None):
+        """Analyze a single message against SOP rules
+
+        text_lower may be passed when the caller has already lowercased message.
+        """
         if speaker != "Speaker 2":  # Only analyze agent messages
             return
         
-        message_lower = message.lower()
+        timestamp = datetime.now().strftime('%H:%M:%S')
         
         # Greeting Protocol
-        if any(greeting in message_lower for greeting in ["hello", "hi", "good morning", "good afternoon"]):
+        if self._patterns["greeting"].search(message):
             self.analysis_results["greeting_protocol"]["score"] += 1
             self.analysis_results["greeting_protocol"]["details"].append(
-                f"✓ Used appropriate greeting at {datetime.now().strftime('%H:%M:%S')}"
+                f"✓ Used appropriate greeting at {timestamp}"
             )
         self.analysis_results["greeting_protocol"]["total"] += 1
         
         # Problem Identification
-        if any(phrase in message_lower for phrase in ["what seems to be", "what's the issue", "how can i help"]):
+        if self._patterns["problem"].search(message):
             self.analysis_results["problem_identification"]["score"] += 1
             self.analysis_results["problem_identification"]["details"].append(
-                f"✓ Asked about the problem at {datetime.now().strftime('%H:%M:%S')}"
+                f"✓ Asked about the problem at {timestamp}"
             )
         self.analysis_results["problem_identification"]["total"] += 1
         
         # Solution Steps
-        if any(phrase in message_lower for phrase in ["next step", "please provide", "upload", "send"]):
+        if self._patterns["solution"].search(message):
             self.analysis_results["solution_steps"]["score"] += 1
             self.analysis_results["solution_steps"]["details"].append(
-                f"✓ Provided clear next steps at {datetime.now().strftime('%H:%M:%S')}"
+                f"✓ Provided clear next steps at {timestamp}"
             )
         self.analysis_results["solution_steps"]["total"] += 1
         
         # Closing Protocol
-        if any(phrase in message_lower for phrase in ["thank you", "anything else", "is there anything else"]):
+        if self._patterns["closing"].search(message):
             self.analysis_results["closing_protocol"]["score"] += 1
             self.analysis_results["closing_protocol"]["details"].append(
-                f"✓ Used appropriate closing at {datetime.now().strftime('%H:%M:%S')}"
+                f"✓ Used appropriate closing at {timestamp}"
             )
         self.analysis_results["closing_protocol"]["total"] += 1
         
-        # Prohibited Phrases
-        for phrase in self.sop_rules["prohibited_phrases"]:
-            if phrase.lower() in message_lower:
-                self.analysis_results["prohibited_phrases"]["score"] -= 1
-                self.analysis_results["prohibited_phrases"]["details"].append(
-                    f"✗ Used prohibited phrase '{phrase}' at {datetime.now().strftime('%H:%M:%S')}"
-                )
+        # Prohibited Phrases (only attribute individual phrases once any has matched)
+        if self._patterns["prohibited"] and self._patterns["prohibited"].search(message):
+            message_lower = text_lower if text_lower is not None else message.lower()
+            for phrase in self.sop_rules["prohibited_phrases"]:
+                if phrase.lower() in message_lower:
+                    self.analysis_results["prohibited_phrases"]["score"] -= 1
+                    self.analysis_results["prohibited_phrases"]["details"].append(
+                        f"✗ Used prohibited phrase '{phrase}' at {timestamp}"
+                    )
         self.analysis_results["prohibited_phrases"]["total"] += 1
         
         # Information Collection
-        if any(phrase in message_lower for phrase in ["order number", "product details", "contact information"]):
+        if self._patterns["info"].search(message):
             self.analysis_results["information_collection"]["score"] += 1
             self.analysis_results["information_collection"]["details"].append(
-                f"✓ Requested required information at {datetime.now().strftime('%H:%M:%S')}"
+                f"✓ Requested required information at {timestamp}"
             )
         self.analysis_results["information_collection"]["total"] += 1
     
@@ -15,12 +15,26 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import whisper
-from transformers import pipeline
 import torch
 import os
 import re
 import numpy as np
 from scipy.spatial.distance import cosine
+from _models import get_batch_sentiment_pipeline
+
+# Common patterns that might indicate different speakers
+_SPEAKER_PATTERNS = [
+    re.compile(r'^[A-Z][a-z]*:'),  # Names followed by colon
+    re.compile(r'^[A-Z][a-z]* says'),  # "X says" pattern
+    re.compile(r'^[A-Z][a-z]* asked'),  # "X asked" pattern
+]
+
+# Map sentiment to emotions
+SENTIMENT_TO_EMOTIONS = {
+    "POS": ["joy", "optimism", "trust"],
+    "NEU": ["neutral", "calm", "indifference"],
+    "NEG": ["anger", "sadness", "frustration"]
+}
 
 def test_whisper():
     print("Testing Whisper with Speaker Detection...")
@@ -113,56 +127,22 @@ def test_whisper():
 
 def is_likely_different_speaker(text1, text2):
     """Simple heuristic to determine if two segments might be from different speakers"""
-    # Check for common patterns that might indicate different speakers
-    patterns = [
-        (r'^[A-Z][a-z]*:', r'^[A-Z][a-z]*:'),  # Names followed by colon
-        (r'^[A-Z][a-z]* says', r'^[A-Z][a-z]* says'),  # "X says" pattern
-        (r'^[A-Z][a-z]* asked', r'^[A-Z][a-z]* asked'),  # "X asked" pattern
-    ]
-    
-    for pattern1, pattern2 in patterns:
-        if re.search(pattern1, text1) and re.search(pattern2, text2):
+    # Both segments must open with the same kind of speaker marker
+    for pattern in _SPEAKER_PATTERNS:
+        if pattern.search(text1) and pattern.search(text2):
             return True
     
     return False
 
-def analyze_emotions(text):
-    try:
-        # Initialize emotion analyzer with a more sophisticated model
-        emotion_analyzer = pipeline(
-            "text-classification",
-            model="finiteautomata/bertweet-base-sentiment-analysis"
-        )
-        
-        # Get emotion analysis
-        result = emotion_analyzer(text)[0]
-        
-        # Map sentiment to emotions
-        sentiment_to_emotions = {
-            "POS": ["joy", "optimism", "trust"],
-            "NEU": ["neutral", "calm", "indifference"],
-            "NEG": ["anger", "sadness", "frustration"]
-        }
-        
-        # Get the main sentiment
-        main_sentiment = result['label']
-        emotions = sentiment_to_emotions.get(main_sentiment, ["neutral"])
-        
-        return [{"label": emotion, "score": result['score']} for emotion in emotions]
-    except Exception as e:
-        print(f"✗ Emotion analysis failed: {str(e)}")
-        return None
+def map_emotions(sentiment_result):
+    """Derive emotion labels from an already computed sentiment result"""
+    emotions = SENTIMENT_TO_EMOTIONS.get(sentiment_result['label'], ["neutral"])
+    return [{"label": emotion, "score": sentiment_result['score']} for emotion in emotions]
 
 def analyze_sentiment(text):
     try:
-        # Initialize sentiment analyzer
-        sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model="finiteautomata/bertweet-base-sentiment-analysis"
-        )
-        
         # Get sentiment analysis
-        result = sentiment_analyzer(text)[0]
+        result = get_batch_sentiment_pipeline()(text)[0]
         return result
     except Exception as e:
         print(f"✗ Sentiment analysis failed: {str(e)}")
@@ -184,15 +164,16 @@ def analyze_conversation(segments):
         print(f"\nAnalysis for {speaker}:")
         full_text = " ".join(texts)
         
-        # Emotion analysis
-        emotions = analyze_emotions(full_text)
-        if emotions:
+        # Sentiment analysis (one model call per speaker)
+        sentiment = analyze_sentiment(full_text)
+        
+        # Emotion analysis, derived from the sentiment result
+        if sentiment:
+            emotions = map_emotions(sentiment)
             print("\nDetected Emotions:")
             for i, emotion in enumerate(emotions, 1):
                 print(f"{i}. {emotion['label']}: {emotion['score']:.2%}")
         
-        # Sentiment analysis
-        sentiment = analyze_sentiment(full_text)
         if sentiment:
             sentiment_map = {
                 "POS": "Positive",